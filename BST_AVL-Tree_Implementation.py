@@ -1,6 +1,7 @@
 import random
 from queue_and_stack import Queue, Stack
 from bst import BSTNode, BST
+from serialization import pack_values, unpack_values
 
 
 class AVLNode(BSTNode):
@@ -28,6 +29,58 @@ class AVL(BST):
         super()._str_helper(self._root, values)
         return "AVL pre-order { " + ", ".join(values) + " }"
 
+    def __reduce_ex__(self, protocol):
+        """
+        Pickles the tree as its pre-order values. The default pickling
+        recurses once per level of nodes and can hit the recursion limit
+        """
+        values = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node:
+                values.append(node.value)
+                stack.append(node.right)
+                stack.append(node.left)
+        return _restore_avl, (type(self), pack_values(values, protocol))
+
+    def _build_from_preorder(self, values) -> AVLNode:
+        """
+        Rebuilds the exact shape of a tree from its pre-order values in O(n)
+        without any rebalancing
+
+        values (Iterable): pre-order values of a valid tree
+
+        Returns the root of the rebuilt tree
+        """
+        root = None
+        nodes = []
+        stack = []
+        for value in values:
+            node = self._new_node(value)
+            nodes.append(node)
+            if not stack:
+                root = node
+            elif value < stack[-1].value:
+                # A smaller value is the left child of the previous node
+                parent = stack[-1]
+                parent.left = node
+            else:
+                # Otherwise it is the right child of the last ancestor that is
+                # still smaller than it
+                while stack and stack[-1].value < value:
+                    parent = stack.pop()
+                parent.right = node
+            # PersistentAVL nodes have no parent pointer
+            if node is not root and isinstance(node, AVLNode):
+                node.parent = parent
+            stack.append(node)
+        # Children come after their parent in pre-order, so walking backwards
+        # fixes heights (and any augmentation) bottom up
+        for node in reversed(nodes):
+            self._update_height(node)
+        return root
+
     def is_valid_avl(self) -> bool:
         stack = Stack()
         stack.push(self._root)
@@ -69,7 +122,7 @@ class AVL(BST):
             return
         # If the tree is empty add the value as rood
         if not self._root:
-            self._root = AVLNode(value)
+            self._root = self._new_node(value)
         else:
             self._root = self._add(self._root, value)
 
@@ -84,7 +137,7 @@ class AVL(BST):
         """
         # Checks if the node is none
         if not node:
-            return AVLNode(value)
+            return self._new_node(value)
         # Recursively adds the value to the left or right tree
         if value < node.value:
             node.left = self._add(node.left, value)
@@ -111,6 +164,17 @@ class AVL(BST):
             return True
         return False
 
+    def _new_node(self, value: object) -> AVLNode:
+        """
+        Creates the node used to store a new value, subclasses that keep
+        extra data in their nodes override this
+
+        value (Object): value for the node
+
+        Returns the new node
+        """
+        return AVLNode(value)
+
     def _remove(self, node: AVLNode, value: object) -> AVLNode:
         """
         Helper metho to remove a value from the tree
@@ -269,4 +333,403 @@ class AVL(BST):
                 node.right = self._rotate_right(node.right)
             node = self._rotate_left(node)
 
-        return node
\ No newline at end of file
+        return node
+
+
+def _restore_avl(cls, packed: tuple) -> AVL:
+    """
+    Rebuilds a pickled tree of the given AVL class from its pre-order values
+    """
+    tree = cls()
+    tree._root = tree._build_from_preorder(unpack_values(packed))
+    return tree
+
+
+class PersistentAVLNode:
+    """
+    Immutable node for PersistentAVL. There is no parent pointer, so a node
+    can be shared by every version of the tree that contains its subtree
+    """
+    __slots__ = ('value', 'left', 'right', 'height')
+
+    def __init__(self, value: object, left=None, right=None) -> None:
+        self.value = value
+        self.left = left
+        self.right = right
+        left_height = left.height if left else -1
+        right_height = right.height if right else -1
+        self.height = 1 + max(left_height, right_height)
+
+    def __str__(self) -> str:
+        return 'Persistent AVL Node: {}'.format(self.value)
+
+
+class AVLSnapshot:
+    """
+    Read only view of one version of a PersistentAVL. Later updates to the
+    tree build new nodes and never touch the nodes a snapshot can reach
+    """
+
+    def __init__(self, root: PersistentAVLNode) -> None:
+        self._root = root
+
+    def __str__(self) -> str:
+        values = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node:
+                values.append(str(node.value))
+                stack.append(node.right)
+                stack.append(node.left)
+        return "AVL snapshot pre-order { " + ", ".join(values) + " }"
+
+    def __iter__(self):
+        """
+        Iterates over the values of the snapshot in order
+        """
+        stack = []
+        node = self._root
+        while stack or node:
+            if node:
+                stack.append(node)
+                node = node.left
+            else:
+                node = stack.pop()
+                yield node.value
+                node = node.right
+
+    def is_empty(self) -> bool:
+        return self._root is None
+
+    def contains(self, value: object) -> bool:
+        """
+        Checks if the value is in this version of the tree
+
+        value (Object): value to search for
+
+        Returns true if value exists else false
+        """
+        node = self._root
+        while node:
+            if value == node.value:
+                return True
+            node = node.left if value < node.value else node.right
+        return False
+
+
+class PersistentAVL(AVL):
+    """
+    Path copying AVL tree. Every add/remove copies only the O(log n) nodes on
+    the path to the change and publishes the new root with a single
+    assignment, so readers working from a snapshot never need a lock and old
+    versions are freed once no snapshot refers to them
+    """
+
+    def __str__(self) -> str:
+        return str(self.snapshot()).replace("AVL snapshot", "Persistent AVL", 1)
+
+    def __iter__(self):
+        return iter(self.snapshot())
+
+    def _new_node(self, value: object) -> PersistentAVLNode:
+        return PersistentAVLNode(value)
+
+    def snapshot(self) -> AVLSnapshot:
+        """
+        Returns an O(1) read only view of the current version of the tree
+        """
+        return AVLSnapshot(self._root)
+
+    def is_valid_avl(self) -> bool:
+        stack = [(self._root, None, None)]
+        while stack:
+            node, low, high = stack.pop()
+            if node:
+                # check for correct height (relative to children)
+                left = node.left.height if node.left else -1
+                right = node.right.height if node.right else -1
+                if node.height != 1 + max(left, right) or abs(left - right) > 1:
+                    return False
+                # values stay inside the bounds set by their ancestors
+                if (low is not None and node.value < low) or \
+                        (high is not None and node.value >= high):
+                    return False
+                stack.append((node.right, node.value, high))
+                stack.append((node.left, low, node.value))
+        return True
+
+    # ------------------------------------------------------------------ #
+
+    def add(self, value: object) -> None:
+        """
+        Add a value to the tree publishing a new version, if the value exists
+        do nothing
+
+        Value (Object): value to add to tree
+        """
+        self._root = self._add(self._root, value)
+
+    def _add(self, node: PersistentAVLNode, value: object) -> PersistentAVLNode:
+        """
+        Helper method to add a value copying the nodes on the search path
+
+        node (PersistentAVLNode): root of subtree
+        value (Object): value to add to the avl tree
+
+        Returns the root of the new subtree, the same node if nothing changed
+        """
+        if not node:
+            return PersistentAVLNode(value)
+        if value < node.value:
+            left = self._add(node.left, value)
+            if left is node.left:
+                return node
+            return self._rebalance(PersistentAVLNode(node.value, left, node.right))
+        if value > node.value:
+            right = self._add(node.right, value)
+            if right is node.right:
+                return node
+            return self._rebalance(PersistentAVLNode(node.value, node.left, right))
+        return node
+
+    def remove(self, value: object) -> bool:
+        """
+        Remove a value from the tree publishing a new version
+
+        value (Object): Value to remove from the tree
+
+        Return true if removed and false if value was not found
+        """
+        root = self._remove(self._root, value)
+        if root is self._root:
+            return False
+        self._root = root
+        return True
+
+    def _remove(self, node: PersistentAVLNode, value: object) -> PersistentAVLNode:
+        """
+        Helper method to remove a value copying the nodes on the search path
+
+        node (PersistentAVLNode): root of subtree
+        value (Object): value to remove from the avl tree
+
+        Returns the root of the new subtree, the same node if nothing changed
+        """
+        if not node:
+            return node
+        if value < node.value:
+            left = self._remove(node.left, value)
+            if left is node.left:
+                return node
+            return self._rebalance(PersistentAVLNode(node.value, left, node.right))
+        if value > node.value:
+            right = self._remove(node.right, value)
+            if right is node.right:
+                return node
+            return self._rebalance(PersistentAVLNode(node.value, node.left, right))
+        # With at most one child the child takes the node's place unchanged
+        if not node.left:
+            return node.right
+        if not node.right:
+            return node.left
+        # If node has two children replace it with a copy holding its successor
+        successor = self._find_min(node.right)
+        right = self._remove(node.right, successor.value)
+        return self._rebalance(PersistentAVLNode(successor.value, node.left, right))
+
+    def _rotate_left(self, node: PersistentAVLNode) -> PersistentAVLNode:
+        """
+        Does a left rotation by building the two rotated nodes anew
+
+        node (PersistentAVLNode): node that needs rotation done on
+
+        Returns the new subtree after rotation
+        """
+        pivot = node.right
+        left = PersistentAVLNode(node.value, node.left, pivot.left)
+        return PersistentAVLNode(pivot.value, left, pivot.right)
+
+    def _rotate_right(self, node: PersistentAVLNode) -> PersistentAVLNode:
+        """
+        Does a right rotation by building the two rotated nodes anew
+
+        node (PersistentAVLNode): node that needs rotation done on
+
+        Returns the new subtree after rotation
+        """
+        pivot = node.left
+        right = PersistentAVLNode(node.value, pivot.right, node.right)
+        return PersistentAVLNode(pivot.value, pivot.left, right)
+
+    def _rebalance(self, node: PersistentAVLNode) -> PersistentAVLNode:
+        """
+        Rebalance a freshly copied node if it is unbalanced. Only the node
+        itself may be replaced, its children can be shared with old versions
+
+        node (PersistentAVLNode): node to rebalance
+
+        Returns the new root of the subtree after rebalancing
+        """
+        if not node:
+            return node
+        balance = self._balance_factor(node)
+        # Checks for left heavy
+        if balance > 1:
+            if self._balance_factor(node.left) < 0:
+                node = PersistentAVLNode(node.value, self._rotate_left(node.left), node.right)
+            return self._rotate_right(node)
+        # Checks for right heavy
+        if balance < -1:
+            if self._balance_factor(node.right) > 0:
+                node = PersistentAVLNode(node.value, node.left, self._rotate_right(node.right))
+            return self._rotate_left(node)
+        return node
+
+
+class IntervalTreeException(Exception):
+    pass
+
+
+class IntervalNode(AVLNode):
+
+    def __init__(self, value: tuple) -> None:
+        # value is the closed interval (low, high)
+        super().__init__(value)
+
+        # largest high endpoint in the subtree rooted at this node
+        self.max_end = value[1]
+
+    def __str__(self) -> str:
+        return 'Interval Node: {} max {}'.format(self.value, self.max_end)
+
+
+class IntervalAVL(AVL):
+    """
+    AVL tree of closed intervals (low, high) ordered by low endpoint. Every
+    node also stores the largest high endpoint of its subtree, which lets
+    overlap queries skip subtrees that end before the probe
+    """
+
+    def add(self, interval: tuple) -> None:
+        """
+        Add an interval to the tree, if the interval exists do nothing
+
+        interval (tuple): closed interval (low, high) with low <= high
+        """
+        if interval[0] > interval[1]:
+            raise IntervalTreeException("Interval low is greater than high")
+        super().add(tuple(interval))
+
+    def remove(self, interval: tuple) -> bool:
+        """
+        Remove an interval from the tree
+
+        interval (tuple): closed interval (low, high)
+
+        Return true if removed and false if interval was not found
+        """
+        return super().remove(tuple(interval))
+
+    def contains(self, interval: tuple) -> bool:
+        """
+        Checks if the interval is in the tree
+
+        interval (tuple): closed interval (low, high)
+
+        Returns true if interval exists else false
+        """
+        return super().contains(tuple(interval))
+
+    def _new_node(self, value: tuple) -> IntervalNode:
+        return IntervalNode(value)
+
+    def _update_height(self, node: IntervalNode) -> None:
+        """
+        Update the height and max endpoint of the node. _add, _remove,
+        _rotate_left, _rotate_right and _rebalance all refresh a node through
+        here after its children change, so the augmentation stays current
+
+        node (IntervalNode): node that needs updating
+        """
+        if node:
+            super()._update_height(node)
+            max_end = node.value[1]
+            if node.left and node.left.max_end > max_end:
+                max_end = node.left.max_end
+            if node.right and node.right.max_end > max_end:
+                max_end = node.right.max_end
+            node.max_end = max_end
+
+    def is_valid_avl(self) -> bool:
+        if not super().is_valid_avl():
+            return False
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node:
+                # check for correct max endpoint (relative to children)
+                max_end = node.value[1]
+                for child in (node.left, node.right):
+                    if child:
+                        max_end = max(max_end, child.max_end)
+                        stack.append(child)
+                if node.max_end != max_end:
+                    return False
+        return True
+
+    # ------------------------------------------------------------------ #
+
+    def overlapping(self, low: object, high: object = None) -> list:
+        """
+        Finds the stored intervals that overlap the closed range [low, high],
+        or that contain the point low when high is not given. The search only
+        enters subtrees that hold at least one match, so its cost is the
+        O(log n) search path plus the paths down to the k matches
+
+        low (Object): point or start of the query range
+        high (Object): end of the query range
+
+        Returns the overlapping intervals ordered by low endpoint
+        """
+        if high is None:
+            high = low
+        if low > high:
+            raise IntervalTreeException("Query low is greater than high")
+        result = []
+        stack = []
+        node = self._root if self._root and self._root.max_end >= low else None
+        # In-order walk pruned on both sides: a subtree whose max endpoint is
+        # below low cannot match, nor can anything right of a node starting
+        # after high
+        while stack or node:
+            if node:
+                stack.append(node)
+                node = node.left if node.left and node.left.max_end >= low else None
+            else:
+                node = stack.pop()
+                node_low, node_high = node.value
+                if node_low > high:
+                    break
+                if node_high >= low:
+                    result.append(node.value)
+                node = node.right if node.right and node.right.max_end >= low else None
+        return result
+
+    def overlapping_batch(self, probes) -> list:
+        """
+        Answers many overlap queries at once. Repeated probes are answered
+        from a copy of the first result instead of searching the tree again
+
+        probes (Iterable): points or (low, high) ranges to query
+
+        Returns a list holding the overlapping intervals for each probe
+        """
+        answers = {}
+        results = []
+        for probe in probes:
+            query = tuple(probe) if isinstance(probe, (tuple, list)) else (probe, probe)
+            if query not in answers:
+                answers[query] = self.overlapping(*query)
+            results.append(list(answers[query]))
+        return results
@@ -0,0 +1,511 @@
+import mmap
+import pickle
+import struct
+from bisect import bisect_left, bisect_right
+
+from serialization import pack_values, unpack_values
+
+
+class BTreeException(Exception):
+    pass
+
+
+class BTreeLeaf:
+    """
+    Leaf page of the B+ tree. Leaves hold the keys in sorted order and are
+    linked left to right so range scans never go back up the tree
+    """
+    __slots__ = ('keys', 'next')
+
+    def __init__(self, keys=None) -> None:
+        self.keys = keys if keys is not None else []
+        self.next = None
+
+    def __str__(self) -> str:
+        return 'BTree Leaf: {}'.format(self.keys)
+
+
+class BTreeInternal:
+    """
+    Internal page of the B+ tree. children[i] holds the keys k where
+    keys[i - 1] <= k < keys[i]
+    """
+    __slots__ = ('keys', 'children')
+
+    def __init__(self, keys=None, children=None) -> None:
+        self.keys = keys if keys is not None else []
+        self.children = children if children is not None else []
+
+    def __str__(self) -> str:
+        return 'BTree Internal: {}'.format(self.keys)
+
+
+# Page file layout: one header page, then every leaf in key order, then the
+# leaf directory. A leaf takes as many whole pages as its pickled key list
+# needs. The directory holds the first key and file offset of every leaf so
+# the internal nodes can be rebuilt without reading the leaves themselves.
+_MAGIC = b'BTREEPG2'
+_FILE_HEADER = struct.Struct('<8sIIQQQQ')  # magic, page size, order, leaves, size,
+                                           # directory offset, directory length
+_LEAF_HEADER = struct.Struct('<IQ')        # pages spanned, payload length
+
+
+class BTreePagedLeaf(BTreeLeaf):
+    """
+    Leaf that is still in a memory mapped page file. Its keys are read from
+    the file the first time they are needed and kept in memory after that
+    """
+    __slots__ = ('_keys', '_pages', '_offset')
+
+    def __init__(self, pages: mmap.mmap, offset: int) -> None:
+        self._keys = None
+        self._pages = pages
+        self._offset = offset
+        self.next = None
+
+    @property
+    def keys(self) -> list:
+        if self._keys is None:
+            self.page_in()
+        return self._keys
+
+    @keys.setter
+    def keys(self, keys: list) -> None:
+        self._keys = keys
+        self._pages = None
+
+    def is_paged_in(self) -> bool:
+        return self._keys is not None
+
+    def page_in(self) -> None:
+        """
+        Reads the keys from the page file, does nothing if already read
+        """
+        if self._keys is None:
+            _, length = _LEAF_HEADER.unpack_from(self._pages, self._offset)
+            start = self._offset + _LEAF_HEADER.size
+            self._keys = pickle.loads(self._pages[start:start + length])
+            self._pages = None
+
+
+class BTree:
+
+    def __init__(self, start_tree=None, order: int = 64, page_file: str = None,
+                 page_size: int = 4096) -> None:
+        """
+        Initialize a new B+ tree sorted container
+
+        start_tree (Iterable): values to add to the tree
+        order (int): max number of children of an internal node
+        page_file (str): optional default file for save()
+        page_size (int): size in bytes of one page in the page file
+        """
+        if order < 4:
+            raise BTreeException("Order must be at least 4")
+        if page_size < _FILE_HEADER.size + _LEAF_HEADER.size:
+            raise BTreeException("Page size too small")
+        self._order = order
+        self._max_keys = order - 1
+        self._min_keys = (order - 1) // 2
+        self._page_file = page_file
+        self._page_size = page_size
+        self._pages = None
+        self._root = BTreeLeaf()
+        self._size = 0
+
+        if start_tree is not None:
+            for value in start_tree:
+                self.add(value)
+
+    def __str__(self) -> str:
+        values = [str(value) for value in self]
+        return "BTREE in-order { " + ", ".join(values) + " }"
+
+    def __iter__(self):
+        """
+        Iterates over all values in sorted order by walking the leaf chain
+        """
+        leaf = self._first_leaf()
+        while leaf:
+            yield from leaf.keys
+            leaf = leaf.next
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __reduce_ex__(self, protocol):
+        """
+        Pickles the tree as its sorted values, which are bulk loaded in O(n)
+        when unpickled. The page file stays with the original tree
+        """
+        return _restore_btree, (type(self), self._order, self._page_size,
+                                pack_values(list(self), protocol))
+
+    def size(self) -> int:
+        return self._size
+
+    def is_empty(self) -> bool:
+        return self._size == 0
+
+    def get_order(self) -> int:
+        return self._order
+
+    def height(self) -> int:
+        """
+        Returns the number of levels above the leaves, -1 for an empty tree
+        """
+        if self._size == 0:
+            return -1
+        height = 0
+        node = self._root
+        while isinstance(node, BTreeInternal):
+            node = node.children[0]
+            height += 1
+        return height
+
+    # ------------------------------------------------------------------ #
+
+    def add(self, value: object) -> None:
+        """
+        Add a value to the tree splitting full nodes on the way back up,
+        if the value exists do nothing
+
+        value (Object): value to add to tree
+        """
+        leaf, path = self._find_leaf(value)
+        index = bisect_left(leaf.keys, value)
+        if index < len(leaf.keys) and leaf.keys[index] == value:
+            return
+        leaf.keys.insert(index, value)
+        self._size += 1
+        if len(leaf.keys) <= self._max_keys:
+            return
+
+        # Split the leaf, the first key of the right half becomes the separator
+        mid = len(leaf.keys) // 2
+        right = BTreeLeaf(leaf.keys[mid:])
+        del leaf.keys[mid:]
+        right.next = leaf.next
+        leaf.next = right
+        separator = right.keys[0]
+        new_child = right
+
+        # Push the separator up, splitting internal nodes that overflow
+        while path:
+            parent, index = path.pop()
+            parent.keys.insert(index, separator)
+            parent.children.insert(index + 1, new_child)
+            if len(parent.keys) <= self._max_keys:
+                return
+            mid = len(parent.keys) // 2
+            separator = parent.keys[mid]
+            new_child = BTreeInternal(parent.keys[mid + 1:],
+                                      parent.children[mid + 1:])
+            del parent.keys[mid:]
+            del parent.children[mid + 1:]
+
+        # The root itself was split so the tree grows a level
+        self._root = BTreeInternal([separator], [self._root, new_child])
+
+    def remove(self, value: object) -> bool:
+        """
+        Remove a value from the tree borrowing from or merging with siblings
+        when a node drops below half full
+
+        value (Object): Value to remove from the tree
+
+        Return true if removed and false if value was not found
+        """
+        leaf, path = self._find_leaf(value)
+        index = bisect_left(leaf.keys, value)
+        if index == len(leaf.keys) or leaf.keys[index] != value:
+            return False
+        del leaf.keys[index]
+        self._size -= 1
+
+        node = leaf
+        while path and len(node.keys) < self._min_keys:
+            parent, index = path.pop()
+            if isinstance(node, BTreeLeaf):
+                self._fix_leaf(parent, index)
+            else:
+                self._fix_internal(parent, index)
+            node = parent
+
+        # Shrink the tree when the root is left with a single child
+        if isinstance(self._root, BTreeInternal) and not self._root.keys:
+            self._root = self._root.children[0]
+        return True
+
+    def contains(self, value: object) -> bool:
+        """
+        Checks if the value is in the tree
+
+        value (Object): value to search for
+
+        Returns true if value exists else false
+        """
+        node = self._root
+        while isinstance(node, BTreeInternal):
+            node = node.children[bisect_right(node.keys, value)]
+        index = bisect_left(node.keys, value)
+        return index < len(node.keys) and node.keys[index] == value
+
+    def range_scan(self, low: object = None, high: object = None):
+        """
+        Yields the values v with low <= v <= high in sorted order, a missing
+        bound leaves that side of the range open
+
+        low (Object): smallest value to yield
+        high (Object): largest value to yield
+        """
+        if low is None:
+            leaf = self._first_leaf()
+            index = 0
+        else:
+            leaf, _ = self._find_leaf(low)
+            index = bisect_left(leaf.keys, low)
+        while leaf:
+            keys = leaf.keys
+            if high is not None and keys and keys[-1] > high:
+                yield from keys[index:bisect_right(keys, high)]
+                return
+            yield from keys[index:]
+            leaf = leaf.next
+            index = 0
+
+    def _find_leaf(self, value: object):
+        """
+        Walks from the root to the leaf that should hold the value
+
+        value (Object): value to search for
+
+        Returns the leaf and the path of (internal node, child index) pairs
+        """
+        path = []
+        node = self._root
+        while isinstance(node, BTreeInternal):
+            index = bisect_right(node.keys, value)
+            path.append((node, index))
+            node = node.children[index]
+        return node, path
+
+    def _first_leaf(self) -> BTreeLeaf:
+        """
+        Returns the left most leaf of the tree
+        """
+        node = self._root
+        while isinstance(node, BTreeInternal):
+            node = node.children[0]
+        return node
+
+    def _fix_leaf(self, parent: BTreeInternal, index: int) -> None:
+        """
+        Refills the underfull leaf at parent.children[index]
+
+        parent (BTreeInternal): parent of the underfull leaf
+        index (int): position of the leaf in the parent
+        """
+        node = parent.children[index]
+        left = parent.children[index - 1] if index > 0 else None
+        right = parent.children[index + 1] if index + 1 < len(parent.children) else None
+        # Borrow from a sibling that can spare a key
+        if left and len(left.keys) > self._min_keys:
+            node.keys.insert(0, left.keys.pop())
+            parent.keys[index - 1] = node.keys[0]
+        elif right and len(right.keys) > self._min_keys:
+            node.keys.append(right.keys.pop(0))
+            parent.keys[index] = right.keys[0]
+        # Otherwise merge with a sibling and drop the separator
+        elif left:
+            left.keys.extend(node.keys)
+            left.next = node.next
+            del parent.keys[index - 1]
+            del parent.children[index]
+        else:
+            node.keys.extend(right.keys)
+            node.next = right.next
+            del parent.keys[index]
+            del parent.children[index + 1]
+
+    def _fix_internal(self, parent: BTreeInternal, index: int) -> None:
+        """
+        Refills the underfull internal node at parent.children[index]
+
+        parent (BTreeInternal): parent of the underfull node
+        index (int): position of the node in the parent
+        """
+        node = parent.children[index]
+        left = parent.children[index - 1] if index > 0 else None
+        right = parent.children[index + 1] if index + 1 < len(parent.children) else None
+        # Rotate a key through the parent from a sibling that can spare one
+        if left and len(left.keys) > self._min_keys:
+            node.keys.insert(0, parent.keys[index - 1])
+            node.children.insert(0, left.children.pop())
+            parent.keys[index - 1] = left.keys.pop()
+        elif right and len(right.keys) > self._min_keys:
+            node.keys.append(parent.keys[index])
+            node.children.append(right.children.pop(0))
+            parent.keys[index] = right.keys.pop(0)
+        # Otherwise pull the separator down and merge with a sibling
+        elif left:
+            left.keys.append(parent.keys[index - 1])
+            left.keys.extend(node.keys)
+            left.children.extend(node.children)
+            del parent.keys[index - 1]
+            del parent.children[index]
+        else:
+            node.keys.append(parent.keys[index])
+            node.keys.extend(right.keys)
+            node.children.extend(right.children)
+            del parent.keys[index]
+            del parent.children[index + 1]
+
+    # ------------------------------------------------------------------ #
+
+    def _bulk_load(self, values) -> None:
+        """
+        Replaces the contents of the tree with already sorted, distinct values
+        building it bottom up in O(n)
+
+        values (Iterable): sorted values to load
+        """
+        values = list(values)
+        self._size = len(values)
+        if not values:
+            self._root = BTreeLeaf()
+            return
+
+        # Spread the values evenly so every leaf is at least half full
+        count = -(-len(values) // self._max_keys)
+        leaves = []
+        lows = []
+        start = 0
+        for i in range(count):
+            end = start + len(values) // count + (1 if i < len(values) % count else 0)
+            leaves.append(BTreeLeaf(values[start:end]))
+            lows.append(values[start])
+            start = end
+        self._build_levels(leaves, lows)
+
+    def _build_levels(self, leaves: list, lows: list) -> None:
+        """
+        Links the leaves left to right and groups each level under parents
+        until a single root is left
+
+        leaves (list): leaves in key order, at least one
+        lows (list): smallest key of each leaf
+        """
+        for leaf, following in zip(leaves, leaves[1:]):
+            leaf.next = following
+        nodes = leaves
+        while len(nodes) > 1:
+            count = -(-len(nodes) // self._order)
+            parents = []
+            parent_lows = []
+            start = 0
+            for i in range(count):
+                end = start + len(nodes) // count + (1 if i < len(nodes) % count else 0)
+                parents.append(BTreeInternal(lows[start + 1:end], nodes[start:end]))
+                parent_lows.append(lows[start])
+                start = end
+            nodes = parents
+            lows = parent_lows
+        self._root = nodes[0]
+
+    def save(self, page_file: str = None) -> None:
+        """
+        Writes the tree to a page file, one leaf after another in page aligned
+        blocks followed by the leaf directory. The tree itself stays in memory
+
+        page_file (str): file to write, defaults to the tree's page file
+        """
+        page_file = page_file or self._page_file
+        if page_file is None:
+            raise BTreeException("No page file to save to")
+        # Every leaf is read below anyway, and the mapping must be gone before
+        # the file it maps can be rewritten
+        self.close()
+
+        page_size = self._page_size
+        lows = []
+        offsets = []
+        with open(page_file, 'wb') as file:
+            file.write(bytes(page_size))  # header is written last
+            offset = page_size
+            leaf = self._first_leaf()
+            # An empty tree is a single empty leaf, which is not written
+            while leaf and leaf.keys:
+                payload = pickle.dumps(leaf.keys, pickle.HIGHEST_PROTOCOL)
+                pages = -(-(_LEAF_HEADER.size + len(payload)) // page_size)
+                file.write(_LEAF_HEADER.pack(pages, len(payload)))
+                file.write(payload)
+                file.write(bytes(pages * page_size - _LEAF_HEADER.size - len(payload)))
+                lows.append(leaf.keys[0])
+                offsets.append(offset)
+                offset += pages * page_size
+                leaf = leaf.next
+            directory = pickle.dumps((lows, offsets), pickle.HIGHEST_PROTOCOL)
+            file.write(directory)
+            file.seek(0)
+            file.write(_FILE_HEADER.pack(_MAGIC, page_size, self._order, len(offsets),
+                                         self._size, offset, len(directory)))
+        self._page_file = page_file
+
+    @classmethod
+    def open(cls, page_file: str) -> "BTree":
+        """
+        Opens a page file written by save(). The internal nodes are rebuilt
+        from the leaf directory while the leaves stay in a read only memory
+        map and are only read the first time a search or scan reaches them.
+        Keys are decoded with pickle, so only open page files from a trusted
+        source: a crafted file can run arbitrary code
+
+        page_file (str): file to open
+
+        Returns the tree backed by the file
+        """
+        with open(page_file, 'rb') as file:
+            header = file.read(_FILE_HEADER.size)
+            if len(header) < _FILE_HEADER.size:
+                raise BTreeException("Not a B-tree page file")
+            magic, page_size, order, leaves, size, directory, length = _FILE_HEADER.unpack(header)
+            if magic != _MAGIC:
+                raise BTreeException("Not a B-tree page file")
+            pages = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(pages) < directory + length:
+            pages.close()
+            raise BTreeException("Page file is truncated")
+        lows, offsets = pickle.loads(pages[directory:directory + length])
+        tree = cls(order=order, page_file=page_file, page_size=page_size)
+        if leaves:
+            tree._pages = pages
+            tree._size = size
+            tree._build_levels([BTreePagedLeaf(pages, offset) for offset in offsets], lows)
+        else:
+            pages.close()
+        return tree
+
+    def close(self) -> None:
+        """
+        Reads every leaf still in the page file and releases the memory map,
+        the tree keeps working from memory afterwards
+        """
+        if self._pages is None:
+            return
+        leaf = self._first_leaf()
+        while leaf:
+            if isinstance(leaf, BTreePagedLeaf):
+                leaf.page_in()
+            leaf = leaf.next
+        self._pages.close()
+        self._pages = None
+
+def _restore_btree(cls, order: int, page_size: int, packed: tuple) -> BTree:
+    """
+    Rebuilds a pickled tree by bulk loading its sorted values
+    """
+    tree = cls(order=order, page_size=page_size)
+    tree._bulk_load(unpack_values(packed))
+    return tree
@@ -1,3 +1,9 @@
+import math
+import os
+from collections import deque
+from multiprocessing import Pool
+
+from serialization import pack_values, unpack_values
 from static_array import StaticArray
 
 
@@ -6,11 +12,51 @@ class DynamicArrayException(Exception):
     pass
 
 
+class GrowthPolicy:
+    def __init__(self, growth_factor: float = 2, shrink_threshold: float = 0.25,
+                 shrink_factor: float = 2, min_capacity: int = 10):
+        # growth_factor: capacity multiplier when the array is full
+        # shrink_threshold: shrink once size drops below this share of capacity
+        # shrink_factor: capacity after a shrink is size * shrink_factor
+        # min_capacity: never shrink below this capacity
+        if growth_factor <= 1 or shrink_factor <= 1 or min_capacity < 1:
+            raise DynamicArrayException("Invalid growth policy")
+        # The array must come out of a shrink above the threshold, otherwise
+        # the next removal would shrink it again
+        if not 0 <= shrink_threshold < 1 / shrink_factor:
+            raise DynamicArrayException("Shrink threshold leaves no hysteresis")
+        self.growth_factor = growth_factor
+        self.shrink_threshold = shrink_threshold
+        self.shrink_factor = shrink_factor
+        self.min_capacity = min_capacity
+
+    def __repr__(self) -> str:
+        return (f"GrowthPolicy(growth_factor={self.growth_factor}, "
+                f"shrink_threshold={self.shrink_threshold}, "
+                f"shrink_factor={self.shrink_factor}, min_capacity={self.min_capacity})")
+
+    def grow(self, capacity: int, needed: int) -> int:
+        # Capacity to grow to when at least needed slots are required
+        return max(needed, math.ceil(capacity * self.growth_factor))
+
+    def shrink(self, capacity: int, size: int) -> int:
+        # Capacity to shrink to after a removal, or capacity if no shrink is due
+        if capacity > self.min_capacity and size < capacity * self.shrink_threshold:
+            return max(math.ceil(size * self.shrink_factor), self.min_capacity)
+        return capacity
+
+
 class DynamicArray:
-    def __init__(self, start_array=None):
+    def __init__(self, start_array=None, policy: GrowthPolicy = None):
         self._size = 0
         self._capacity = 4
         self._data = StaticArray(self._capacity)
+        self._policy = policy if policy is not None else GrowthPolicy()
+
+        # counters for tuning the policy: number of resizes and elements
+        # copied by them
+        self._resize_count = 0
+        self._copy_count = 0
 
         # populate dynamic array with initial values (if provided)
         # before using this feature, implement append() method
@@ -28,6 +74,13 @@ class DynamicArray:
         self._index = 0
         return self
 
+    def __reduce_ex__(self, protocol):
+        # Pickles the elements as one flat column rather than the StaticArray,
+        # numeric arrays go out-of-band under protocol 5
+        values = [self.get_at_index(i) for i in range(self._size)]
+        return _restore_dynamic_array, (type(self), self._policy, self._capacity,
+                                        pack_values(values, protocol))
+
     def __next__(self):
         try:
             value = self[self._index]
@@ -62,6 +115,19 @@ class DynamicArray:
     def get_capacity(self) -> int:
         return self._capacity
 
+    def get_policy(self) -> GrowthPolicy:
+        return self._policy
+
+    def get_resize_count(self) -> int:
+        return self._resize_count
+
+    def get_copy_count(self) -> int:
+        return self._copy_count
+
+    def reset_counters(self) -> None:
+        self._resize_count = 0
+        self._copy_count = 0
+
     def print_da_variables(self) -> None:
         print(f"Length: {self._size}, Capacity: {self._capacity}, {self._data}")
 
@@ -77,17 +143,23 @@ class DynamicArray:
         # Moves temp arr into the StaticArray
         self._data = new_data
         self._capacity = new_capacity
+        self._resize_count += 1
+        self._copy_count += self._size
+
+    def reserve(self, capacity: int) -> None:
+        # Grows the array once so the next appends up to capacity never resize
+        if capacity > self._capacity:
+            self.resize(capacity)
+
+    def shrink_to_fit(self) -> None:
+        # Releases all unused capacity
+        if self._capacity > max(self._size, 1):
+            self.resize(max(self._size, 1))
 
     def append(self, value: object) -> None:
-       # Checks for needed size increase and increases to 2x
+        # Checks for needed size increase and grows as set by the policy
         if self._size == self._capacity:
-            new_capacity = self._capacity * 2
-            new_data = StaticArray(new_capacity)
-            for i in range(self._size):
-                new_data.set(i, self._data.get(i))
-            # Copies elements from new_data to old Array
-            self._data = new_data
-            self._capacity = new_capacity
+            self.resize(self._policy.grow(self._capacity, self._size + 1))
         self._data.set(self._size, value)
         self._size += 1
 
@@ -97,8 +169,7 @@ class DynamicArray:
             raise DynamicArrayException("Invalid index")
         # Checks for needed size increase
         if self._size == self._capacity:
-            new_capacity = self._capacity * 2
-            self.resize(new_capacity)
+            self.resize(self._policy.grow(self._capacity, self._size + 1))
 
         # Shift elements to the right to make space for the new value
         for i in range(self._size, index, -1):
@@ -113,17 +184,18 @@ class DynamicArray:
         if index < 0 or index >= self._size:
             raise DynamicArrayException("Invalid index")
 
-        # Check if size reduction is needed before removal
-        if self._capacity > 10 and self._size < self._capacity / 4:
-            new_capacity = max(self._size * 2, 10)
-            self.resize(new_capacity)
-
         # Shift elements to the left to overwrite the removed element
         for i in range(index, self._size - 1):
             self._data.set(i, self._data.get(i + 1))
 
-        # Decrease size
+        # Decrease size and release the reference held by the freed slot
         self._size -= 1
+        self._data.set(self._size, None)
+
+        # Shrink after the removal so one fewer element is copied
+        new_capacity = self._policy.shrink(self._capacity, self._size)
+        if new_capacity < self._capacity:
+            self.resize(new_capacity)
 
     def slice(self, start_index: int, size: int) -> "DynamicArray":
         # Checks for Invalid Index or Size
@@ -132,8 +204,9 @@ class DynamicArray:
         # Verifies Array has enough Elements
         if start_index + size > self._size:
             raise DynamicArrayException("Not enough elements to make the slice")
-        # Creates dynamic array for storage
-        sliced_array = DynamicArray()
+        # Creates dynamic array for storage sized for the slice up front
+        sliced_array = DynamicArray(policy=self._policy)
+        sliced_array.reserve(size)
         for i in range(start_index, start_index + size):
             sliced_array.append(self._data.get(i))
     
@@ -141,7 +214,8 @@ class DynamicArray:
 
     def map(self, map_func) -> "DynamicArray":
         # Creates new dynamic array to iterate over the original arrays elements
-        mapped_array = DynamicArray()
+        mapped_array = DynamicArray(policy=self._policy)
+        mapped_array.reserve(self._size)
         for i in range(self._size):
             # Applies Map function and appends to the Array
             mapped_value = map_func(self._data.get(i))
@@ -151,7 +225,7 @@ class DynamicArray:
 
     def filter(self, filter_func) -> "DynamicArray":
         # Creates new dynamic array to iterate over the original array elements
-        filtered_array = DynamicArray()
+        filtered_array = DynamicArray(policy=self._policy)
         for i in range(self._size):
             # Applys the filter and returns function with only true elements
             if filter_func(self._data.get(i)):
@@ -177,33 +251,210 @@ class DynamicArray:
         return result
 
 
-def chunk(arr: DynamicArray) -> "DynamicArray":
-    if arr.is_empty():
-        return DynamicArray()
-    
-    chunks = DynamicArray()
-    current_chunk = DynamicArray()
+class GapDynamicArray(DynamicArray):
+    # Same API as DynamicArray, stored as a circular buffer with a movable
+    # gap. Logical index i lives at (head + i) before the gap and shifted by
+    # the gap length after it. Edits at either end or at the last edited
+    # position only move the gap a few slots, making them O(1) amortized.
+    def __init__(self, start_array=None, policy: GrowthPolicy = None):
+        self._head = 0
+        self._gap = 0
+        super().__init__(start_array, policy)
 
-    # Iterate through the input array
-    for i in range(arr.length()):
-        # If current_chunk is empty or the current value is greater than or equal to the last value in current_chunk append the value to current_chunk
-        if current_chunk.is_empty() or arr.get_at_index(i) >= current_chunk[current_chunk.length() - 1]:
-            current_chunk.append(arr.get_at_index(i))
+    def __str__(self) -> str:
+        self._compact()
+        return super().__str__()
+
+    def _physical(self, index: int) -> int:
+        if index >= self._gap:
+            index += self._capacity - self._size
+        return (self._head + index) % self._capacity
+
+    def get_at_index(self, index: int) -> object:
+        if index < 0 or index >= self._size:
+            raise DynamicArrayException
+        return self._data[self._physical(index)]
+
+    def set_at_index(self, index: int, value: object) -> None:
+        if index < 0 or index >= self._size:
+            raise DynamicArrayException
+        self._data[self._physical(index)] = value
+
+    # -----------------------------------------------------------------------
+
+    def _relayout(self, new_capacity: int) -> None:
+        # Copies the elements in logical order to the start of a new buffer
+        new_data = StaticArray(new_capacity)
+        for i in range(self._size):
+            new_data.set(i, self._data.get(self._physical(i)))
+        self._data = new_data
+        self._capacity = new_capacity
+        self._head = 0
+        self._gap = self._size
+
+    def _compact(self) -> None:
+        # Lines up logical and physical indexes so inherited whole-array
+        # methods can read the buffer directly
+        if self._head != 0 or (self._gap != self._size and self._size != self._capacity):
+            self._relayout(self._capacity)
+
+    def resize(self, new_capacity: int) -> None:
+        if new_capacity <= 0 or new_capacity < self._size:
+            return  # No work to be done, exit immediately
+        self._relayout(new_capacity)
+        self._resize_count += 1
+        self._copy_count += self._size
+
+    def _wrap_gap(self) -> None:
+        # A gap at the end and a gap at the start are the same free slots
+        # between tail and head, switch between the two descriptions
+        gap_length = self._capacity - self._size
+        if self._gap == self._size:
+            self._head = (self._head - gap_length) % self._capacity
+            self._gap = 0
+        else:
+            self._head = (self._head + gap_length) % self._capacity
+            self._gap = self._size
+
+    def _shift_gap(self, count: int) -> None:
+        # Moves the gap count positions right (or left if negative) by moving
+        # the elements it passes over to the other side of it
+        gap_length = self._capacity - self._size
+        if count > 0:
+            for i in range(self._gap, self._gap + count):
+                source = (self._head + i + gap_length) % self._capacity
+                self._data.set((self._head + i) % self._capacity, self._data.get(source))
+                self._data.set(source, None)
+        else:
+            for i in range(self._gap - 1, self._gap + count - 1, -1):
+                source = (self._head + i) % self._capacity
+                self._data.set((self._head + i + gap_length) % self._capacity, self._data.get(source))
+                self._data.set(source, None)
+        self._gap += count
+
+    def _gap_cost(self, index: int) -> int:
+        # Elements moved to bring the gap to index, directly or by going
+        # around through the ends of the array
+        if self._size == self._capacity:
+            return 0
+        direct = abs(index - self._gap)
+        around = min(self._gap, index) + self._size - max(self._gap, index)
+        return min(direct, around)
+
+    def _move_gap(self, index: int) -> None:
+        if self._size == self._capacity:
+            # Without free slots every gap position is the same layout
+            self._gap = index
+            return
+        direct = abs(index - self._gap)
+        if direct <= self._gap_cost(index):
+            self._shift_gap(index - self._gap)
+        elif index < self._gap:
+            self._shift_gap(self._size - self._gap)
+            self._wrap_gap()
+            self._shift_gap(index)
+        else:
+            self._shift_gap(-self._gap)
+            self._wrap_gap()
+            self._shift_gap(index - self._size)
+
+    def append(self, value: object) -> None:
+        self.insert_at_index(self._size, value)
+
+    def insert_at_index(self, index: int, value: object) -> None:
+        # Checks for Invalid indexs
+        if index < 0 or index > self._size:
+            raise DynamicArrayException("Invalid index")
+        # Checks for needed size increase
+        if self._size == self._capacity:
+            self.resize(self._policy.grow(self._capacity, self._size + 1))
+
+        # Fill the first slot of the gap once it sits at index
+        self._move_gap(index)
+        self._data.set((self._head + index) % self._capacity, value)
+        self._gap += 1
+        self._size += 1
+
+    def remove_at_index(self, index: int) -> None:
+        # Checks for Invalid Indexs
+        if index < 0 or index >= self._size:
+            raise DynamicArrayException("Invalid index")
+
+        # The element can join the gap from either side, use the cheaper one
+        if self._gap_cost(index + 1) < self._gap_cost(index):
+            self._move_gap(index + 1)
+            self._data.set((self._head + index) % self._capacity, None)
+            self._gap -= 1
         else:
-            # If the current value is less than the last value in current_chunk, append current_chunk to chunks
-            chunks.append(current_chunk)
-            # Start a new current_chunk with the current value
+            self._move_gap(index)
+            self._data.set(self._physical(index), None)
+        self._size -= 1
+
+        # Shrink after the removal so one fewer element is copied
+        new_capacity = self._policy.shrink(self._capacity, self._size)
+        if new_capacity < self._capacity:
+            self.resize(new_capacity)
+
+    def slice(self, start_index: int, size: int) -> "DynamicArray":
+        self._compact()
+        return super().slice(start_index, size)
+
+    def map(self, map_func) -> "DynamicArray":
+        self._compact()
+        return super().map(map_func)
+
+    def filter(self, filter_func) -> "DynamicArray":
+        self._compact()
+        return super().filter(filter_func)
+
+    def reduce(self, reduce_func, initializer=None) -> object:
+        self._compact()
+        return super().reduce(reduce_func, initializer)
+
+
+def _restore_dynamic_array(cls, policy: GrowthPolicy, capacity: int, packed: tuple) -> DynamicArray:
+    # Rebuilds a pickled array with its capacity reserved up front
+    arr = cls(policy=policy)
+    arr.reserve(capacity)
+    for value in unpack_values(packed):
+        arr.append(value)
+    arr.reset_counters()
+    return arr
+
+
+def iter_chunks(iterable):
+    # Yields each non-descending run as a DynamicArray as soon as a smaller
+    # value ends it, so it works on unbounded streams
+    current_chunk = DynamicArray()
+    last = None
+    for value in iterable:
+        if not current_chunk.is_empty() and value < last:
+            yield current_chunk
             current_chunk = DynamicArray()
-            current_chunk.append(arr.get_at_index(i))
+        current_chunk.append(value)
+        last = value
+
+    # The last run ends with the input
+    if not current_chunk.is_empty():
+        yield current_chunk
+
 
-    # Append the last current_chunk to chunks
-    chunks.append(current_chunk)
+def chunk(arr: DynamicArray) -> "DynamicArray":
+    chunks = DynamicArray()
+    for current_chunk in iter_chunks(_values(arr)):
+        chunks.append(current_chunk)
 
     return chunks
 
 
-def find_mode(arr: DynamicArray) -> tuple[DynamicArray, int]:
-    
+def find_mode(arr: DynamicArray, presorted: bool = True) -> tuple[DynamicArray, int]:
+    # Unsorted input (any iterable) is counted in one pass with a HashMap
+    if not presorted:
+        return _modes_from_counts(*_count_values(arr))
+
+    if arr.is_empty():
+        return DynamicArray(), 0
+
     mode_values = DynamicArray()  
     max_frequency = 0  
     current_frequency = 1  
@@ -239,3 +490,140 @@ def find_mode(arr: DynamicArray) -> tuple[DynamicArray, int]:
         mode_values.append(current_value)
     
     return mode_values, max_frequency
+
+
+def _values(arr: DynamicArray):
+    # Index based generator, unlike iter(arr) it can be used while the array
+    # is iterated elsewhere
+    for i in range(arr.length()):
+        yield arr.get_at_index(i)
+
+
+def _count_values(iterable) -> tuple["HashMap", DynamicArray]:
+    # Counts each value in a HashMap, also returns the distinct values in the
+    # order they were first seen. HashMap is imported here so the array
+    # itself only needs StaticArray
+    from HashMap import HashMap
+
+    counts = HashMap(11, hash)
+    distinct = DynamicArray()
+    if isinstance(iterable, DynamicArray):
+        iterable = _values(iterable)
+    for value in iterable:
+        count = counts.get(value)
+        if count is None:
+            distinct.append(value)
+            count = 0
+        counts.put(value, count + 1)
+    return counts, distinct
+
+
+def _modes_from_counts(counts: "HashMap", distinct: DynamicArray) -> tuple[DynamicArray, int]:
+    # Picks the values with the highest count, in first seen order
+    mode_values = DynamicArray()
+    max_frequency = 0
+    for value in _values(distinct):
+        frequency = counts.get(value)
+        if frequency > max_frequency:
+            max_frequency = frequency
+            mode_values = DynamicArray()
+            mode_values.append(value)
+        elif frequency == max_frequency:
+            mode_values.append(value)
+    return mode_values, max_frequency
+
+
+# ---------------------------------------------------------------------------
+# Multi-process variants. The input (any iterable, also unbounded) is read in
+# fixed-size batches, each worker handles one batch and the partial results
+# are merged in order. Only a bounded window of batches is in flight at once.
+# On platforms that start workers with spawn (Windows, macOS) the calling
+# script must guard its entry point with if __name__ == '__main__'.
+
+PARALLEL_BATCH = 10000
+
+
+def _batches(iterable, batch_size: int):
+    # Groups the input into lists of batch_size values, the last may be shorter
+    if isinstance(iterable, DynamicArray):
+        iterable = _values(iterable)
+    batch = []
+    for value in iterable:
+        batch.append(value)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _ordered_map(pool: Pool, func, batches, processes: int):
+    # Like pool.imap, but only reads the next batch once a slot is free, so
+    # an unbounded input is never pulled into memory ahead of the workers
+    pending = deque()
+    for batch in batches:
+        pending.append(pool.apply_async(func, (batch,)))
+        if len(pending) >= 2 * processes:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def _chunk_part(values: list) -> list:
+    # Worker: runs of one batch as plain lists so they pickle cheaply
+    return [[current_chunk[i] for i in range(current_chunk.length())]
+            for current_chunk in iter_chunks(values)]
+
+
+def _count_part(values: list) -> list:
+    # Worker: (value, count) pairs of one batch in first seen order
+    counts, distinct = _count_values(values)
+    return [(value, counts.get(value)) for value in _values(distinct)]
+
+
+def parallel_chunk(iterable, processes: int = None, batch_size: int = PARALLEL_BATCH):
+    # Generator version of chunk() spread over processes. Each run is yielded
+    # as soon as the next one starts, a run at the end of a batch waits for
+    # the following batch since it may continue there
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        yield from iter_chunks(_values(iterable) if isinstance(iterable, DynamicArray) else iterable)
+        return
+
+    last = None
+    with Pool(processes) as pool:
+        for runs in _ordered_map(pool, _chunk_part, _batches(iterable, batch_size), processes):
+            for run in runs:
+                # A run cut by a batch boundary continues the previous run
+                if last is None or run[0] < last[last.length() - 1]:
+                    if last is not None:
+                        yield last
+                    last = DynamicArray()
+                last.reserve(last.length() + len(run))
+                for value in run:
+                    last.append(value)
+    if last is not None:
+        yield last
+
+
+def parallel_find_mode(iterable, processes: int = None,
+                       batch_size: int = PARALLEL_BATCH) -> tuple[DynamicArray, int]:
+    # Works on sorted and unsorted input, a value split across a batch
+    # boundary has its partial counts summed
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        return find_mode(iterable, presorted=False)
+
+    from HashMap import HashMap
+
+    counts = HashMap(11, hash)
+    distinct = DynamicArray()
+    with Pool(processes) as pool:
+        for pairs in _ordered_map(pool, _count_part, _batches(iterable, batch_size), processes):
+            for value, count in pairs:
+                total = counts.get(value)
+                if total is None:
+                    distinct.append(value)
+                    total = 0
+                counts.put(value, total + count)
+    return _modes_from_counts(counts, distinct)
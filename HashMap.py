@@ -1,9 +1,56 @@
 from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
                         hash_function_1, hash_function_2)
+from serialization import pack_values, unpack_values
+
+
+class BloomFilter:
+    """
+    Bit array that answers "definitely not present" for most missing keys.
+    Positions come from double hashing two independent hashes of the key
+    """
+
+    def __init__(self, expected_keys: int, bits_per_key: int = 10, hashes: int = 7) -> None:
+        """
+        expected_keys (int): number of keys the filter is sized for
+        bits_per_key (int): bits per key, 10 gives about 1% false positives
+        hashes (int): number of bit positions set per key
+        """
+        self._bit_count = max(64, expected_keys * bits_per_key)
+        self._bits = bytearray((self._bit_count + 7) // 8)
+        self._hashes = hashes
+
+    def add(self, first_hash: int, second_hash: int) -> None:
+        """
+        Sets the bits of a key
+
+        first_hash (int): first hash of the key
+        second_hash (int): second, independent hash of the key
+        """
+        for i in range(self._hashes):
+            position = (first_hash + i * second_hash) % self._bit_count
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, first_hash: int, second_hash: int) -> bool:
+        """
+        Checks the bits of a key
+
+        Returns false if the key was never added, true if it probably was
+        """
+        for i in range(self._hashes):
+            position = (first_hash + i * second_hash) % self._bit_count
+            if not self._bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    def __init__(self, capacity: int, function, bloom_filter: bool = False) -> None:
+        """
+        capacity (int): initial number of buckets, rounded up to a prime
+        function (Callable): hash function for the keys
+        bloom_filter (bool): keep a Bloom filter in front of the table so
+                             most lookups of missing keys skip probing
+        """
         self._buckets = DynamicArray()
 
         # capacity must be a prime number
@@ -14,6 +61,11 @@ class HashMap:
         self._hash_function = function
         self._size = 0
 
+        # Bloom filter sized for the most keys the table holds before resizing
+        self._filter = BloomFilter(self._capacity // 2) if bloom_filter else None
+        # keys removed since the filter was built, their bits are still set
+        self._filter_stale = 0
+
     def __str__(self) -> str:
         out = ''
         for i in range(self._buckets.length()):
@@ -45,12 +97,51 @@ class HashMap:
 
         return True
 
+    def __reduce_ex__(self, protocol):
+        """
+        Pickles the live entries as a key column and a value column instead
+        of the bucket array. The hash function is pickled by reference
+        """
+        keys = []
+        values = []
+        for index in range(self._buckets.length()):
+            entry = self._buckets[index]
+            if entry and not entry.is_tombstone:
+                keys.append(entry.key)
+                values.append(entry.value)
+        return _restore_hash_map, (type(self), self._capacity, self._hash_function,
+                                   self._filter is not None,
+                                   pack_values(keys, protocol), pack_values(values, protocol))
+
     def get_size(self) -> int:
         return self._size
 
     def get_capacity(self) -> int:
         return self._capacity
 
+    def has_bloom_filter(self) -> bool:
+        return self._filter is not None
+
+    @staticmethod
+    def _filter_hash(key: str) -> int:
+        """
+        Second hash for the Bloom filter. The key is salted so it stays
+        independent of the table's function even when that is the builtin hash
+        """
+        return hash((key, 0x9E3779B9)) | 1
+
+    def _rebuild_filter(self) -> None:
+        """
+        Builds a fresh Bloom filter from the live keys, clearing the bits of
+        removed keys
+        """
+        self._filter = BloomFilter(self._capacity // 2)
+        self._filter_stale = 0
+        for index in range(self._buckets.length()):
+            entry = self._buckets[index]
+            if entry and not entry.is_tombstone:
+                self._filter.add(self._hash_function(entry.key), self._filter_hash(entry.key))
+
     # ------------------------------------------------------------------ #
 
     def put(self, key: str, value: object) -> None:
@@ -63,20 +154,37 @@ class HashMap:
         if self.table_load() >= 0.5:
             self.resize_table(self._capacity * 2)
         # Get initial index
-        index = self._hash_function(key) % self._capacity
-        i = 0
-        # Probe to find correct index
-        while True:
+        key_hash = self._hash_function(key)
+        index = key_hash % self._capacity
+        first_tombstone = None
+        # Probe to find the key, it may sit past a tombstone so keep probing
+        # to the first empty bucket and reuse the first tombstone seen. After
+        # churn there may be no empty bucket left on the probe sequence, so
+        # stop after capacity steps
+        for i in range(self._capacity):
             new_index = (index + i * i) % self._capacity
             entry = self._buckets[new_index]
-            if entry is None or entry.is_tombstone:
-                self._buckets[new_index] = HashEntry(key, value)
-                self._size += 1
-                return
+            if entry is None:
+                break
+            elif entry.is_tombstone:
+                if first_tombstone is None:
+                    first_tombstone = new_index
             elif entry.key == key:
-                self._buckets[new_index].value = value
+                entry.value = value
                 return
-            i += 1
+        else:
+            # With a prime capacity and load below 0.5 the probes always pass
+            # a tombstone here, grow the table in case they somehow did not
+            if first_tombstone is None:
+                self.resize_table(self._capacity * 2)
+                self.put(key, value)
+                return
+        if first_tombstone is not None:
+            new_index = first_tombstone
+        self._buckets[new_index] = HashEntry(key, value)
+        self._size += 1
+        if self._filter:
+            self._filter.add(key_hash, self._filter_hash(key))
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -92,6 +200,10 @@ class HashMap:
         self._buckets = DynamicArray()
         self._capacity = new_capacity
         self._size = 0
+        # The filter is rebuilt for the new capacity as the entries are rehashed
+        if self._filter:
+            self._filter = BloomFilter(self._capacity // 2)
+            self._filter_stale = 0
         # Initialize new buckets
         for _ in range(self._capacity):
             self._buckets.append(None)
@@ -122,10 +234,25 @@ class HashMap:
 
         Key (str): key to search for 
         """
-        index = self._hash_function(key) % self._capacity
-        i = 0
-        # Probe to find the key
-        while True:
+        entry = self._find_entry(key)
+        return entry.value if entry else None
+
+    def _find_entry(self, key: str) -> HashEntry:
+        """
+        Finds the live entry for the key, asking the Bloom filter first so
+        most missing keys are answered without probing
+
+        key (str): key to search for
+
+        Returns the entry or None if the key is not in the table
+        """
+        key_hash = self._hash_function(key)
+        if self._filter and not self._filter.might_contain(key_hash, self._filter_hash(key)):
+            return None
+        index = key_hash % self._capacity
+        # Probe to find the key, at most capacity steps since tombstones can
+        # leave no empty bucket on the probe sequence
+        for i in range(self._capacity):
             new_index = (index + i * i) % self._capacity
             entry = self._buckets[new_index]
             if entry is None:
@@ -133,18 +260,18 @@ class HashMap:
                 return None
             if entry.key == key and not entry.is_tombstone:
                 # Key found
-                return entry.value
-            i += 1
+                return entry
+        return None
 
     def contains_key(self, key: str) -> bool:
         """
-        Checks if the key exists in the table
+        Checks if the key exists in the table, also when its value is None
 
         key (str): Key to search for
 
         Returns true if key exists else false
         """
-        return self.get(key) is not None
+        return self._find_entry(key) is not None
 
     def remove(self, key: str) -> None:
         """
@@ -152,19 +279,19 @@ class HashMap:
 
         key (str): key to remove
         """
-        index = self._hash_function(key) % self._capacity
-        i = 0
-        while True:
-            new_index = (index + i * i) % self._capacity
-            entry = self._buckets[new_index]
-            if entry is None:
-                return
-            if entry.key == key and not entry.is_tombstone:
-                # Key is found make it tombstone
-                entry.is_tombstone = True
-                self._size -= 1
-                return
-            i += 1
+        entry = self._find_entry(key)
+        if entry is None:
+            return
+        # Key is found make it tombstone
+        entry.is_tombstone = True
+        self._size -= 1
+        # Bits can't be cleared from a Bloom filter, rebuild it once removed
+        # keys fill a quarter of the table's worth of bits. A rebuild costs
+        # O(capacity) and comes at most every capacity / 4 removals
+        if self._filter:
+            self._filter_stale += 1
+            if self._filter_stale > self._capacity // 4:
+                self._rebuild_filter()
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -184,6 +311,9 @@ class HashMap:
         for index in range(self._buckets.length()):
             self._buckets[index] = None
         self._size = 0
+        if self._filter:
+            self._filter = BloomFilter(self._capacity // 2)
+            self._filter_stale = 0
 
     def __iter__(self):
         """
@@ -202,3 +332,16 @@ class HashMap:
             if entry and not entry.is_tombstone:
                 return entry
         raise StopIteration
+
+
+def _restore_hash_map(cls, capacity: int, function, bloom_filter: bool,
+                      keys: tuple, values: tuple) -> HashMap:
+    """
+    Rebuilds a pickled HashMap. The entries are rehashed because hashes of
+    the builtin hash function differ between processes, the table keeps its
+    capacity so no resizing happens on the way
+    """
+    table = cls(capacity, function, bloom_filter)
+    for key, value in zip(unpack_values(keys), unpack_values(values)):
+        table.put(key, value)
+    return table
@@ -1,4 +1,5 @@
 from dynamic_array import *
+from serialization import pack_values, unpack_values
 
 
 class MinHeapException(Exception):
@@ -31,6 +32,13 @@ class MinHeap:
         heap_data = [self._heap[i] for i in range(self._heap.length())]
         return "HEAP " + str(heap_data)
 
+    def __reduce_ex__(self, protocol):
+        """
+        Pickles the heap as its flat array, which is already in heap order
+        """
+        values = [self._heap[i] for i in range(self._heap.length())]
+        return _restore_min_heap, (type(self), pack_values(values, protocol))
+
     def add(self, node: object) -> None:
         """
         Add a new element to the heap
@@ -140,6 +148,18 @@ class MinHeap:
             index = min_child
             child = 2 * index + 1
 
+
+def _restore_min_heap(cls, packed: tuple) -> MinHeap:
+    """
+    Rebuilds a pickled heap in O(n), the values keep their heap order so
+    nothing needs to percolate
+    """
+    heap = cls()
+    for value in unpack_values(packed):
+        heap._heap.append(value)
+    return heap
+
+
 def heapsort(da: DynamicArray) -> None:
     """
     Sort the dynamic array using heapsort algorithm
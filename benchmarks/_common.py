@@ -0,0 +1,133 @@
+"""
+Shared helpers for the benchmark scripts: loading the data structure modules
+from the repository root, timing calls and writing results as JSON
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_module(filename: str, name: str):
+    """
+    Imports a module from the repository root by file name, which also works
+    for files like BST_AVL-Tree_Implementation.py that are not valid module names
+
+    filename (str): file name relative to the repository root
+    name (str): name to register the module under
+
+    Returns the module or None if its supporting files are not available
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+    spec = importlib.util.spec_from_file_location(name, REPO_ROOT / filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as error:
+        del sys.modules[name]
+        print("skipping {}: {}".format(filename, error), file=sys.stderr)
+        return None
+    return module
+
+
+def time_call(func, repeat: int = 3, setup=None) -> float:
+    """
+    Runs func repeat times with the garbage collector paused
+
+    func (Callable): function to time, called with no arguments or with the
+                     result of setup
+    setup (Callable): optional untimed function run before each call
+
+    Returns the best wall clock time in seconds
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        args = (setup(),) if setup else ()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func(*args)
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def parse_args(description: str, default_sizes):
+    """
+    Builds the command line shared by all benchmark scripts
+
+    description (str): help text for the script
+    default_sizes (list): sizes to run when none are given
+
+    Returns the parsed arguments
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--sizes', type=lambda text: [int(float(size)) for size in text.split(',')],
+                        default=default_sizes,
+                        help='comma separated sizes, e.g. 1e3,1e4,1e5')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per measurement, the best one is kept')
+    parser.add_argument('--seed', type=int, default=261)
+    parser.add_argument('--output', type=Path, default=None,
+                        help='JSON file to write the results to')
+    return parser.parse_args()
+
+
+def record(results: list, structure: str, operation: str, size: int,
+           seconds: float, ops: int, **extra) -> None:
+    """
+    Appends one measurement to the results and prints it
+
+    ops (int): number of operations the measurement covered
+    """
+    entry = {
+        'structure': structure,
+        'operation': operation,
+        'size': size,
+        'seconds': seconds,
+        'ns_per_op': seconds / ops * 1e9 if ops else None,
+    }
+    entry.update(extra)
+    results.append(entry)
+    label = ' '.join('{}={}'.format(key, value) for key, value in extra.items())
+    print('{:<16} {:<18} n={:<10} {:>12.1f} ns/op {}'.format(
+        structure, operation, size, entry['ns_per_op'] or 0.0, label))
+
+
+def write_results(path: Path, benchmark: str, args, results: list) -> None:
+    """
+    Writes the results with enough metadata to compare runs between versions
+    """
+    if path is None:
+        return
+    try:
+        revision = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT,
+                                  capture_output=True, text=True).stdout.strip()
+    except OSError:
+        revision = ''
+    document = {
+        'benchmark': benchmark,
+        'revision': revision or None,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'sizes': args.sizes,
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'results': results,
+    }
+    path.write_text(json.dumps(document, indent=2) + '\n')
@@ -0,0 +1,91 @@
+"""
+Compares the B+ tree in BTree.py against the AVL tree for insert, lookup and
+range scan. Larger sizes (up to 1e8) can be passed with --sizes, they take
+a long time and a lot of memory in pure Python.
+
+    python benchmarks/bench_btree.py --sizes 1e5,1e6 --output btree.json
+"""
+import random
+
+from _common import load_module, parse_args, record, time_call, write_results
+
+SCANS = 1000
+SCAN_WIDTH = 100
+
+
+def avl_range_scan(tree, low, high) -> list:
+    """
+    In-order walk of the AVL tree that skips subtrees outside [low, high]
+    """
+    result = []
+    stack = []
+    node = tree._root
+    while stack or node:
+        if node:
+            if node.value >= low:
+                stack.append(node)
+                node = node.left
+            else:
+                node = node.right
+        else:
+            node = stack.pop()
+            if node.value > high:
+                break
+            result.append(node.value)
+            node = node.right
+    return result
+
+
+def run(name: str, make_tree, scan, keys: list, probes: list, ranges: list,
+        size: int, repeat: int, results: list, **extra) -> None:
+    trees = []
+
+    def insert():
+        trees.clear()
+        tree = make_tree()
+        for key in keys:
+            tree.add(key)
+        trees.append(tree)
+
+    record(results, name, 'insert', size, time_call(insert, repeat), size, **extra)
+    tree = trees[-1]
+    trees.clear()
+
+    def lookup():
+        for probe in probes:
+            tree.contains(probe)
+
+    record(results, name, 'lookup', size, time_call(lookup, repeat), len(probes), **extra)
+
+    def range_scan():
+        for low, high in ranges:
+            scan(tree, low, high)
+
+    record(results, name, 'range_scan', size, time_call(range_scan, repeat), len(ranges), **extra)
+
+
+def main() -> None:
+    args = parse_args(__doc__, [10 ** 5, 10 ** 6])
+    btree = load_module('BTree.py', 'BTree')
+    avl = load_module('BST_AVL-Tree_Implementation.py', 'avl')
+    results = []
+    rng = random.Random(args.seed)
+    for size in args.sizes:
+        keys = list(range(size))
+        rng.shuffle(keys)
+        probes = [rng.randrange(2 * size) for _ in range(min(size, 10 ** 6))]
+        starts = [rng.randrange(max(size - SCAN_WIDTH, 1)) for _ in range(SCANS)]
+        ranges = [(start, start + SCAN_WIDTH - 1) for start in starts]
+
+        for order in (16, 64, 256):
+            run('BTree', lambda: btree.BTree(order=order),
+                lambda tree, low, high: list(tree.range_scan(low, high)),
+                keys, probes, ranges, size, args.repeat, results, order=order)
+        if avl is not None:
+            run('AVL', avl.AVL, avl_range_scan,
+                keys, probes, ranges, size, args.repeat, results)
+    write_results(args.output, 'btree', args, results)
+
+
+if __name__ == '__main__':
+    main()
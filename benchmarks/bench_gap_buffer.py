@@ -0,0 +1,98 @@
+"""
+Compares the contiguous DynamicArray with GapDynamicArray (and list/deque
+as baselines) on front-heavy and cursor-local edit patterns:
+
+    queue      append at the back, remove from the front
+    push_front insert at index 0, remove from the back
+    cursor     editor-style typing: a cursor that mostly inserts/deletes
+               where it is and occasionally jumps a few positions
+
+    python benchmarks/bench_gap_buffer.py --sizes 1e3,1e4 --output gap.json
+"""
+import random
+from collections import deque
+
+from _common import load_module, parse_args, record, time_call, write_results
+
+OPS = 10000
+
+
+def queue(arr, ops):
+    for i in range(ops):
+        arr.append(i)
+        arr.remove_at_index(0)
+
+
+def push_front(arr, ops):
+    for i in range(ops):
+        arr.insert_at_index(0, i)
+        arr.remove_at_index(arr.length() - 1)
+
+
+def cursor(arr, moves):
+    position = arr.length() // 2
+    for move in moves:
+        position = min(max(position + move, 0), arr.length())
+        if move >= 0:
+            arr.insert_at_index(position, move)
+            position += 1
+        elif position > 0:
+            arr.remove_at_index(position - 1)
+            position -= 1
+
+
+def cursor_list(arr, moves):
+    position = len(arr) // 2
+    for move in moves:
+        position = min(max(position + move, 0), len(arr))
+        if move >= 0:
+            arr.insert(position, move)
+            position += 1
+        elif position > 0:
+            del arr[position - 1]
+            position -= 1
+
+
+def main() -> None:
+    args = parse_args(__doc__, [10 ** 3, 10 ** 4])
+    module = load_module('DynamicArrayandADT.py', 'DynamicArrayandADT')
+    if module is None:
+        return
+    results = []
+    rng = random.Random(args.seed)
+    for size in args.sizes:
+        # Mostly typing in place (0), some deletes (-1), rare short jumps
+        moves = rng.choices([0, 0, 0, 0, 0, -1, -1, 3, -3], k=OPS)
+        for name, cls in (('DynamicArray', module.DynamicArray),
+                          ('GapDynamicArray', module.GapDynamicArray)):
+            def setup():
+                return cls(range(size))
+
+            record(results, name, 'queue', size, time_call(lambda arr: queue(arr, OPS), args.repeat, setup), 2 * OPS)
+            record(results, name, 'push_front', size, time_call(lambda arr: push_front(arr, OPS), args.repeat, setup), 2 * OPS)
+            record(results, name, 'cursor', size, time_call(lambda arr: cursor(arr, moves), args.repeat, setup), OPS)
+
+        def queue_list(arr):
+            for i in range(OPS):
+                arr.append(i)
+                arr.pop(0)
+
+        def queue_deque(arr):
+            for i in range(OPS):
+                arr.append(i)
+                arr.popleft()
+
+        def push_front_deque(arr):
+            for i in range(OPS):
+                arr.appendleft(i)
+                arr.pop()
+
+        record(results, 'list', 'queue', size, time_call(queue_list, args.repeat, lambda: list(range(size))), 2 * OPS)
+        record(results, 'deque', 'queue', size, time_call(queue_deque, args.repeat, lambda: deque(range(size))), 2 * OPS)
+        record(results, 'deque', 'push_front', size, time_call(push_front_deque, args.repeat, lambda: deque(range(size))), 2 * OPS)
+        record(results, 'list', 'cursor', size, time_call(lambda arr: cursor_list(arr, moves), args.repeat, lambda: list(range(size))), OPS)
+    write_results(args.output, 'gap_buffer', args, results)
+
+
+if __name__ == '__main__':
+    main()
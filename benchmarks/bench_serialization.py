@@ -0,0 +1,75 @@
+"""
+Round-trip (dumps + loads) throughput of the custom pickling of every
+structure under protocol 4, protocol 5 in-band and protocol 5 with
+out-of-band buffers, against pickling the equivalent list or dict.
+
+    python benchmarks/bench_serialization.py --sizes 1e4,1e5 --output pickle.json
+"""
+import pickle
+import random
+
+from _common import load_module, parse_args, record, time_call, write_results
+
+MODES = (('p4', 4, False), ('p5', 5, False), ('p5_oob', 5, True))
+
+
+def round_trip(obj, protocol: int, out_of_band: bool) -> int:
+    """
+    Pickles and unpickles obj
+
+    Returns the size of the pickle stream plus out-of-band buffers in bytes
+    """
+    buffers = []
+    if out_of_band:
+        data = pickle.dumps(obj, protocol=protocol, buffer_callback=buffers.append)
+    else:
+        data = pickle.dumps(obj, protocol=protocol)
+    pickle.loads(data, buffers=buffers)
+    return len(data) + sum(memoryview(buffer).nbytes for buffer in buffers)
+
+
+def bench(name: str, obj, size: int, repeat: int, results: list, **extra) -> None:
+    for mode, protocol, out_of_band in MODES:
+        nbytes = round_trip(obj, protocol, out_of_band)
+        seconds = time_call(lambda: round_trip(obj, protocol, out_of_band), repeat)
+        record(results, name, 'round_trip', size, seconds, size, mode=mode, bytes=nbytes, **extra)
+
+
+def main() -> None:
+    args = parse_args(__doc__, [10 ** 4, 10 ** 5])
+    modules = {
+        'DynamicArray': load_module('DynamicArrayandADT.py', 'DynamicArrayandADT'),
+        'HashMap': load_module('HashMap.py', 'HashMap'),
+        'MinHeap': load_module('MinHeap.py', 'MinHeap'),
+        'AVL': load_module('BST_AVL-Tree_Implementation.py', 'avl'),
+        'BTree': load_module('BTree.py', 'BTree'),
+    }
+    results = []
+    rng = random.Random(args.seed)
+    for size in args.sizes:
+        values = rng.sample(range(size * 4), size)
+        keys = ['key{}'.format(value) for value in values]
+
+        bench('list', values, size, args.repeat, results)
+        bench('dict', dict(zip(keys, values)), size, args.repeat, results)
+        if modules['DynamicArray']:
+            bench('DynamicArray', modules['DynamicArray'].DynamicArray(values), size, args.repeat, results,
+                  values='int')
+            floats = modules['DynamicArray'].DynamicArray(value / 3 for value in values)
+            bench('DynamicArray', floats, size, args.repeat, results, values='float')
+        if modules['HashMap']:
+            table = modules['HashMap'].HashMap(size * 2, modules['HashMap'].hash_function_2)
+            for key, value in zip(keys, values):
+                table.put(key, value)
+            bench('HashMap', table, size, args.repeat, results)
+        if modules['MinHeap']:
+            bench('MinHeap', modules['MinHeap'].MinHeap(values), size, args.repeat, results)
+        if modules['AVL']:
+            bench('AVL', modules['AVL'].AVL(values), size, args.repeat, results)
+        if modules['BTree']:
+            bench('BTree', modules['BTree'].BTree(values), size, args.repeat, results)
+    write_results(args.output, 'serialization', args, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+"""
+Benchmarks DynamicArray, HashMap, MinHeap and AVL against the built in
+list, dict, heapq and bisect baselines over a range of sizes. Results are
+written as JSON so runs from different versions can be diffed with
+compare.py. Sizes up to 1e7 can be passed with --sizes. Cases that cost
+O(n) per operation are cut down so large sizes stay feasible:
+insert_at_index (and its list baseline) runs SHIFT_BUDGET // size
+operations, between 1 and OP_LIMIT, since every insert shifts about half
+the array through StaticArray; bisect insort/remove runs at most OP_LIMIT.
+
+    python benchmarks/bench_suite.py --sizes 1e3,1e4,1e5 --output suite.json
+"""
+import bisect
+import heapq
+import random
+from functools import reduce
+from itertools import product
+
+from _common import load_module, parse_args, record, time_call, write_results
+
+OP_LIMIT = 1000
+SHIFT_BUDGET = 10 ** 7
+LOAD_FACTORS = (0.1, 0.25, 0.45)
+
+
+def bench_dynamic_array(module, size, rng, repeat, results) -> None:
+    values = [rng.randrange(size) for _ in range(size)]
+    # About SHIFT_BUDGET / 2 element shifts per measurement at any size
+    inserts = max(1, min(size, OP_LIMIT, SHIFT_BUDGET // size))
+    positions = [rng.randrange(size) for _ in range(inserts)]
+    slices = [(rng.randrange(size // 2 + 1), size // 2) for _ in range(min(size, 100))]
+
+    def append():
+        arr = module.DynamicArray()
+        for value in values:
+            arr.append(value)
+        return arr
+
+    def append_list():
+        arr = []
+        for value in values:
+            arr.append(value)
+        return arr
+
+    record(results, 'DynamicArray', 'append', size, time_call(append, repeat), size)
+    record(results, 'list', 'append', size, time_call(append_list, repeat), size)
+
+    arr = append()
+    baseline = list(values)
+
+    def insert_at_index():
+        for index in positions:
+            arr.insert_at_index(index, index)
+        for _ in positions:
+            arr.remove_at_index(arr.length() - 1)
+
+    def insert_list():
+        for index in positions:
+            baseline.insert(index, index)
+        for _ in positions:
+            baseline.pop()
+
+    # Each round inserts and then pops from the back so the size is unchanged
+    ops = 2 * len(positions)
+    record(results, 'DynamicArray', 'insert_at_index', size, time_call(insert_at_index, repeat), ops)
+    record(results, 'list', 'insert', size, time_call(insert_list, repeat), ops)
+
+    def slice_():
+        for start, length in slices:
+            arr.slice(start, length)
+
+    def slice_list():
+        for start, length in slices:
+            baseline[start:start + length]
+
+    record(results, 'DynamicArray', 'slice', size, time_call(slice_, repeat), len(slices))
+    record(results, 'list', 'slice', size, time_call(slice_list, repeat), len(slices))
+
+    def double(value):
+        return value * 2
+
+    def is_even(value):
+        return value % 2 == 0
+
+    def add(total, value):
+        return total + value
+
+    cases = (
+        ('map', lambda: arr.map(double), lambda: [double(value) for value in baseline]),
+        ('filter', lambda: arr.filter(is_even), lambda: [value for value in baseline if is_even(value)]),
+        ('reduce', lambda: arr.reduce(add), lambda: reduce(add, baseline)),
+    )
+    for operation, ours, builtin in cases:
+        record(results, 'DynamicArray', operation, size, time_call(ours, repeat), size)
+        record(results, 'list', operation, size, time_call(builtin, repeat), size)
+
+
+def bench_hash_map(module, size, rng, repeat, results) -> None:
+    keys = ['key{}'.format(value) for value in rng.sample(range(size * 4), size)]
+    misses = ['miss{}'.format(value) for value in range(size)]
+    functions = (('hash_function_1', module.hash_function_1),
+                 ('hash_function_2', module.hash_function_2))
+
+    for load_factor in LOAD_FACTORS:
+        # Size the table up front so the final load factor is the target
+        capacity = int(size / load_factor) + 1
+        for (name, function), bloom_filter in product(functions, (False, True)):
+            extra = {'load_factor': load_factor, 'hash_function': name,
+                     'bloom_filter': bloom_filter}
+            maps = []
+
+            def put():
+                maps.clear()
+                table = module.HashMap(capacity, function, bloom_filter)
+                for key in keys:
+                    table.put(key, key)
+                maps.append(table)
+
+            record(results, 'HashMap', 'put', size, time_call(put, repeat), size, **extra)
+            table = maps[-1]
+            maps.clear()
+
+            def get_hit():
+                for key in keys:
+                    table.get(key)
+
+            def get_miss():
+                for key in misses:
+                    table.get(key)
+
+            record(results, 'HashMap', 'get_hit', size, time_call(get_hit, repeat), size, **extra)
+            record(results, 'HashMap', 'get_miss', size, time_call(get_miss, repeat), size, **extra)
+
+            def remove():
+                for key in keys:
+                    table.remove(key)
+                for key in keys:
+                    table.put(key, key)
+
+            record(results, 'HashMap', 'remove_put', size, time_call(remove, repeat), 2 * size, **extra)
+
+    table = {}
+
+    def put_dict():
+        table.clear()
+        for key in keys:
+            table[key] = key
+
+    def get_hit_dict():
+        for key in keys:
+            table.get(key)
+
+    def get_miss_dict():
+        for key in misses:
+            table.get(key)
+
+    def remove_dict():
+        for key in keys:
+            del table[key]
+        for key in keys:
+            table[key] = key
+
+    record(results, 'dict', 'put', size, time_call(put_dict, repeat), size)
+    record(results, 'dict', 'get_hit', size, time_call(get_hit_dict, repeat), size)
+    record(results, 'dict', 'get_miss', size, time_call(get_miss_dict, repeat), size)
+    record(results, 'dict', 'remove_put', size, time_call(remove_dict, repeat), 2 * size)
+
+
+def bench_min_heap(module, size, rng, repeat, results) -> None:
+    values = [rng.randrange(size) for _ in range(size)]
+
+    def add():
+        heap = module.MinHeap()
+        for value in values:
+            heap.add(value)
+
+    def add_heapq():
+        heap = []
+        for value in values:
+            heapq.heappush(heap, value)
+
+    record(results, 'MinHeap', 'add', size, time_call(add, repeat), size)
+    record(results, 'heapq', 'heappush', size, time_call(add_heapq, repeat), size)
+
+    source = module.DynamicArray()
+    for value in values:
+        source.append(value)
+
+    def built_heap():
+        heap = module.MinHeap()
+        heap.build_heap(source)
+        return heap
+
+    def remove_min(heap):
+        while not heap.is_empty():
+            heap.remove_min()
+
+    def heapified():
+        heap = list(values)
+        heapq.heapify(heap)
+        return heap
+
+    def remove_heapq(heap):
+        while heap:
+            heapq.heappop(heap)
+
+    # remove_min is timed without the heap construction needed to set it up
+    record(results, 'MinHeap', 'remove_min', size, time_call(remove_min, repeat, built_heap), size)
+    record(results, 'heapq', 'heappop', size, time_call(remove_heapq, repeat, heapified), size)
+
+    def build_heap():
+        module.MinHeap().build_heap(source)
+
+    def heapify():
+        heapq.heapify(list(values))
+
+    record(results, 'MinHeap', 'build_heap', size, time_call(build_heap, repeat), size)
+    record(results, 'heapq', 'heapify', size, time_call(heapify, repeat), size)
+
+    def heapsort():
+        arr = source.slice(0, source.length())
+        module.heapsort(arr)
+
+    def heapsort_heapq():
+        heap = list(values)
+        heapq.heapify(heap)
+        [heapq.heappop(heap) for _ in range(len(heap))]
+
+    record(results, 'MinHeap', 'heapsort', size, time_call(heapsort, repeat), size)
+    record(results, 'heapq', 'heapsort', size, time_call(heapsort_heapq, repeat), size)
+
+
+def bench_avl(module, size, rng, repeat, results) -> None:
+    values = rng.sample(range(size * 2), size)
+    probes = [rng.randrange(size * 2) for _ in range(size)]
+    trees = []
+
+    def add():
+        trees.clear()
+        tree = module.AVL()
+        for value in values:
+            tree.add(value)
+        trees.append(tree)
+
+    record(results, 'AVL', 'add', size, time_call(add, repeat), size)
+    tree = trees[-1]
+    trees.clear()
+
+    def contains():
+        for probe in probes:
+            tree.contains(probe)
+
+    def remove():
+        for value in values[:OP_LIMIT]:
+            tree.remove(value)
+        for value in values[:OP_LIMIT]:
+            tree.add(value)
+
+    record(results, 'AVL', 'contains', size, time_call(contains, repeat), size)
+    record(results, 'AVL', 'remove_add', size, time_call(remove, repeat), 2 * min(size, OP_LIMIT))
+
+    # bisect keeps a sorted list, inserts are O(n) so they are capped too
+    sorted_values = sorted(values)
+    inserts = values[:min(size, OP_LIMIT)]
+
+    def insort():
+        for value in inserts:
+            bisect.insort(sorted_values, value)
+        for value in inserts:
+            del sorted_values[bisect.bisect_left(sorted_values, value)]
+
+    def contains_bisect():
+        for probe in probes:
+            index = bisect.bisect_left(sorted_values, probe)
+            index < len(sorted_values) and sorted_values[index] == probe
+
+    record(results, 'bisect', 'insort_remove', size, time_call(insort, repeat), 2 * len(inserts))
+    record(results, 'bisect', 'contains', size, time_call(contains_bisect, repeat), size)
+
+
+def main() -> None:
+    args = parse_args(__doc__, [10 ** 3, 10 ** 4, 10 ** 5])
+    suites = (
+        ('DynamicArrayandADT.py', 'DynamicArrayandADT', bench_dynamic_array),
+        ('HashMap.py', 'HashMap', bench_hash_map),
+        ('MinHeap.py', 'MinHeap', bench_min_heap),
+        ('BST_AVL-Tree_Implementation.py', 'avl', bench_avl),
+    )
+    results = []
+    for filename, name, bench in suites:
+        module = load_module(filename, name)
+        if module is None:
+            continue
+        for size in args.sizes:
+            bench(module, size, random.Random(args.seed), args.repeat, results)
+    write_results(args.output, 'suite', args, results)
+
+
+if __name__ == '__main__':
+    main()
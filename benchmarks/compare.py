@@ -0,0 +1,67 @@
+"""
+Compares two JSON result files written by the benchmark scripts and lists
+the measurements that got slower (or faster) by more than the threshold.
+Exits with status 1 when anything regressed so it can gate a build.
+
+    python benchmarks/compare.py old.json new.json --threshold 1.10
+"""
+import argparse
+import json
+import sys
+
+# Fields that are not extra parameters of a measurement: its identity and
+# its measured values, which may change between runs
+IDENTITY = ('structure', 'operation', 'size', 'seconds', 'ns_per_op', 'bytes')
+
+
+def key(entry: dict) -> tuple:
+    """
+    Identifies a measurement by everything except its measured values
+    """
+    extra = tuple(sorted((name, value) for name, value in entry.items() if name not in IDENTITY))
+    return entry['structure'], entry['operation'], entry['size'], extra
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=1.10,
+                        help='ratio of new/old time counted as a change')
+    args = parser.parse_args()
+
+    with open(args.old) as file:
+        old = {key(entry): entry for entry in json.load(file)['results']}
+    with open(args.new) as file:
+        new = {key(entry): entry for entry in json.load(file)['results']}
+
+    regressions = 0
+    for name in sorted(old.keys() & new.keys(), key=str):
+        before = old[name]['seconds']
+        after = new[name]['seconds']
+        if not before:
+            continue
+        ratio = after / before
+        old_bytes = old[name].get('bytes')
+        new_bytes = new[name].get('bytes')
+        if ratio > args.threshold:
+            regressions += 1
+            status = 'SLOWER'
+        elif ratio < 1 / args.threshold:
+            status = 'faster'
+        elif old_bytes != new_bytes:
+            status = 'resized'
+        else:
+            continue
+        structure, operation, size, extra = name
+        label = ' '.join('{}={}'.format(field, value) for field, value in extra)
+        if old_bytes != new_bytes:
+            label += ' bytes={}->{}'.format(old_bytes, new_bytes)
+        print('{:<7} {:<14} {:<18} n={:<10} x{:.2f} {}'.format(
+            status, structure, operation, size, ratio, label))
+    print('{} compared, {} regressed'.format(len(old.keys() & new.keys()), regressions))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
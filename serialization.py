@@ -0,0 +1,55 @@
+"""
+Helpers shared by the __reduce_ex__ implementations of the data structures.
+
+A column of values is packed as (typecode, byteorder, payload). Under pickle
+protocol 5 a column made only of ints or only of floats becomes a typed
+array wrapped in a PickleBuffer, which pickle can hand to buffer_callback
+out-of-band instead of copying it into the stream. Any other column is sent
+as a plain list.
+"""
+import sys
+from array import array
+from pickle import PickleBuffer
+
+
+def pack_values(values: list, protocol: int) -> tuple:
+    """
+    Packs a column of values for pickling
+
+    values (list): values to pack
+    protocol (int): pickle protocol in use
+
+    Returns the packed column
+    """
+    if protocol >= 5 and values:
+        typecode = None
+        if all(type(value) is int for value in values):
+            typecode = 'q'
+        elif all(type(value) is float for value in values):
+            typecode = 'd'
+        if typecode:
+            try:
+                return typecode, sys.byteorder, PickleBuffer(array(typecode, values))
+            except OverflowError:
+                pass  # ints too large for 64 bits go as a list
+    return '', None, list(values)
+
+
+def unpack_values(packed: tuple):
+    """
+    Unpacks a column written by pack_values
+
+    packed (tuple): the packed column
+
+    Returns a sequence of the values, a view over the received buffer when
+    no byte swapping is needed
+    """
+    typecode, byteorder, payload = packed
+    if not typecode:
+        return payload
+    if byteorder == sys.byteorder:
+        return memoryview(payload).cast('B').cast(typecode)
+    values = array(typecode)
+    values.frombytes(payload)
+    values.byteswap()
+    return values